@@ -19,29 +19,99 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 from typing import TYPE_CHECKING, cast
 
-from sqlalchemy import delete, select
+from sqlalchemy import bindparam, delete, exists, inspect, select, tuple_
 
-from airflow import models
 from airflow.exceptions import AirflowException, DagNotFound
-from airflow.models import DagModel, DagRun
+from airflow.models import DagModel, DagRun, import_all_models
+from airflow.models.base import metadata
 from airflow.models.errors import ParseImportError
+from airflow.models.log import Log
 from airflow.models.taskinstance import TaskInstance
-from airflow.utils.db import get_sqla_model_classes
+from airflow.models.xcom import XComModel
 from airflow.utils.session import NEW_SESSION, provide_session
 from airflow.utils.state import TaskInstanceState
 
 if TYPE_CHECKING:
-    from sqlalchemy.engine import CursorResult, Result
+    from sqlalchemy import Table
+    from sqlalchemy.engine import CursorResult
     from sqlalchemy.orm import Session
+    from sqlalchemy.sql import Delete
+
+    from airflow.models.base import Base
 
 log = logging.getLogger(__name__)
 
+# Tables that can grow very large for a single DAG, in the order they are purged in batches.
+_BATCHED_DELETE_MODELS = (XComModel, TaskInstance, DagRun, Log)
+
+
+def _is_deleted_by_db_cascade(table: Table) -> bool:
+    """
+    Check whether the database removes the rows of ``table`` through ``ON DELETE CASCADE``.
+
+    That is the case when the ``dag_id`` column is part of a cascading foreign key to another
+    table keyed by ``dag_id``, since the referenced rows are deleted together with the DAG.
+    """
+    return any(
+        fk.parent.name == "dag_id"
+        and (fk.ondelete or "").lower() == "cascade"
+        and "dag_id" in fk.column.table.columns
+        for fk in table.foreign_keys
+    )
+
+
+@functools.cache
+def _delete_statements(keep_records_in_log: bool) -> tuple[Delete, ...]:
+    """
+    Return the DELETE statements removing the rows of a DAG, bound to a ``dag_id`` parameter.
+
+    Tables are in foreign key dependency order, referencing tables before the tables
+    they reference, so every DELETE can run as plain SQL without tripping a constraint.
+    The set of tables is fixed once the models are loaded, so the statements are built once;
+    all models are imported first so lazily imported ones are not left out for good.
+    """
+    import_all_models()
+    return tuple(
+        table.delete().where(table.c.dag_id == bindparam("dag_id"))
+        for table in reversed(metadata.sorted_tables)
+        if "dag_id" in table.c
+        and not _is_deleted_by_db_cascade(table)
+        and (not keep_records_in_log or table.name != "log")
+    )
+
+
+def _delete_in_batches(model: type[Base], dag_id: str, batch_size: int, *, session: Session) -> int:
+    """
+    Delete the rows of ``model`` belonging to ``dag_id``, at most ``batch_size`` rows at a time.
+
+    The transaction is committed after every batch so locks on the table are held only briefly.
+    """
+    pk_columns = inspect(model).primary_key
+    count = 0
+    while True:
+        pks = session.execute(select(*pk_columns).where(model.dag_id == dag_id).limit(batch_size)).all()
+        if not pks:
+            return count
+        if len(pk_columns) == 1:
+            condition = pk_columns[0].in_([pk for (pk,) in pks])
+        else:
+            condition = tuple_(*pk_columns).in_(pks)
+        result = session.execute(delete(model).where(condition).execution_options(synchronize_session=False))
+        count += cast("CursorResult", result).rowcount
+        session.commit()
+
 
 @provide_session
-def delete_dag(dag_id: str, keep_records_in_log: bool = True, session: Session = NEW_SESSION) -> int:
+def delete_dag(
+    dag_id: str,
+    keep_records_in_log: bool = True,
+    batch_size: int | None = None,
+    session: Session = NEW_SESSION,
+) -> int:
     """
     Delete a DAG by a dag_id.
 
@@ -49,36 +119,46 @@ def delete_dag(dag_id: str, keep_records_in_log: bool = True, session: Session =
     :param keep_records_in_log: whether keep records of the given dag_id
         in the Log table in the backend database (for reasons like auditing).
         The default value is True.
+    :param batch_size: if set, rows of the largest tables (XCom, TaskInstance,
+        DagRun and Log) are deleted in batches of at most this many rows,
+        committing after every batch, before the rest of the DAG is deleted.
     :param session: session used
-    :return count of deleted dags
+    :return: the number of rows deleted from tables that reference the DAG. Rows removed by the
+        database through ``ON DELETE CASCADE`` (task instances, XComs, ...) are not included,
+        whether or not ``batch_size`` is set.
     """
     log.info("Deleting DAG: %s", dag_id)
-    running_tis = session.scalar(
-        select(models.TaskInstance.state)
-        .where(models.TaskInstance.dag_id == dag_id)
-        .where(models.TaskInstance.state == TaskInstanceState.RUNNING)
-        .limit(1)
+    # The running TaskInstance check is evaluated per DagModel row, so a DAG that does not
+    # exist is reported without ever looking at the task_instance table.
+    has_running_tis = (
+        exists()
+        .where(TaskInstance.dag_id == dag_id, TaskInstance.state == TaskInstanceState.RUNNING)
+        .label("has_running_tis")
     )
-    if running_tis:
-        raise AirflowException("TaskInstances still running")
-    dag = session.scalar(select(DagModel).where(DagModel.dag_id == dag_id).limit(1))
+    dag = session.execute(
+        select(DagModel.relative_fileloc, DagModel.bundle_name, has_running_tis)
+        .where(DagModel.dag_id == dag_id)
+        .limit(1)
+    ).first()
     if dag is None:
         raise DagNotFound(f"Dag id {dag_id} not found")
-
-    # To ensure the TaskInstance and DagRun model is deleted before
-    # each of the model DagVersion and BackFill respectively.
-    models_for_deletion = [TaskInstance, DagRun] + [
-        model for model in get_sqla_model_classes() if model.__name__ not in ["TaskInstance", "DagRun"]
-    ]
+    if dag.has_running_tis:
+        raise AirflowException("TaskInstances still running")
 
     count: int = 0
-    for model in models_for_deletion:
-        if hasattr(model, "dag_id") and (not keep_records_in_log or model.__name__ != "Log"):
-            result: Result = session.execute(
-                delete(model).where(model.dag_id == dag_id).execution_options(synchronize_session="fetch")
-            )
-            cursor_result = cast("CursorResult", result)
-            count += cursor_result.rowcount
+    if batch_size:
+        for model in _BATCHED_DELETE_MODELS:
+            if keep_records_in_log and model is Log:
+                continue
+            deleted = _delete_in_batches(model, dag_id, batch_size, session=session)
+            # Rows of cascading tables are never counted by the statements below, so don't count
+            # them here either; the result must not depend on batch_size.
+            if not _is_deleted_by_db_cascade(model.__table__):
+                count += deleted
+
+    for stmt in _delete_statements(keep_records_in_log):
+        result = session.execute(stmt, {"dag_id": dag_id})
+        count += cast("CursorResult", result).rowcount
 
     # Delete entries in Import Errors table for a deleted DAG
     # This handles the case when the dag_id is changed in the file
@@ -88,7 +168,7 @@ def delete_dag(dag_id: str, keep_records_in_log: bool = True, session: Session =
             ParseImportError.filename == dag.relative_fileloc,
             ParseImportError.bundle_name == dag.bundle_name,
         )
-        .execution_options(synchronize_session="fetch")
+        .execution_options(synchronize_session=False)
     )
 
     return count
@@ -0,0 +1,118 @@
+# Licensed to the Apache Software Foundation (ASF) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The ASF licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import func, select
+
+from airflow.api.common.delete_dag import _delete_statements, delete_dag
+from airflow.exceptions import AirflowException, DagNotFound
+from airflow.models import DagModel, DagRun
+from airflow.models.dag_version import DagVersion
+from airflow.models.log import Log
+from airflow.models.taskinstance import TaskInstance
+from airflow.models.taskinstancehistory import TaskInstanceHistory
+from airflow.providers.standard.operators.empty import EmptyOperator
+from airflow.utils.state import TaskInstanceState
+
+from tests_common.test_utils.db import clear_db_dags, clear_db_logs, clear_db_runs
+
+pytestmark = [pytest.mark.db_test, pytest.mark.need_serialized_dag]
+
+DAG_ID = "test_delete_dag"
+
+
+def _count(session, model) -> int:
+    return session.scalar(select(func.count()).select_from(model).where(model.dag_id == DAG_ID))
+
+
+@pytest.mark.parametrize("keep_records_in_log", [True, False])
+def test_delete_statements(keep_records_in_log):
+    tables = [stmt.table.name for stmt in _delete_statements(keep_records_in_log)]
+
+    # Removed by ON DELETE CASCADE from dag_run and dag.
+    assert "task_instance" not in tables
+    assert "xcom" not in tables
+    assert "dag_tag" not in tables
+    assert ("log" in tables) is not keep_records_in_log
+    assert tables.index("dag_run") < tables.index("backfill")
+    assert tables.index("dag_run") < tables.index("dag")
+
+
+class TestDeleteDag:
+    def setup_method(self):
+        clear_db_runs()
+        clear_db_dags()
+        clear_db_logs()
+
+    def teardown_method(self):
+        clear_db_runs()
+        clear_db_dags()
+        clear_db_logs()
+
+    def _create_dag_with_run(self, dag_maker, session):
+        with dag_maker(DAG_ID, session=session):
+            EmptyOperator(task_id="task")
+        dr = dag_maker.create_dagrun()
+        ti = dr.get_task_instance("task", session=session)
+        TaskInstanceHistory.record_ti(ti, session=session)
+        session.add(Log(event="test", dag_id=DAG_ID))
+        session.flush()
+        return dr
+
+    def test_delete_dag_not_found(self, session):
+        with pytest.raises(DagNotFound):
+            delete_dag("does_not_exist", session=session)
+
+    def test_delete_dag_with_running_task_instance(self, dag_maker, session):
+        dr = self._create_dag_with_run(dag_maker, session)
+        dr.get_task_instance("task", session=session).set_state(TaskInstanceState.RUNNING, session=session)
+        session.flush()
+
+        with pytest.raises(AirflowException, match="TaskInstances still running"):
+            delete_dag(DAG_ID, session=session)
+
+    @pytest.mark.parametrize("keep_records_in_log", [True, False])
+    def test_delete_dag_removes_dependent_rows(self, dag_maker, session, keep_records_in_log):
+        self._create_dag_with_run(dag_maker, session)
+
+        delete_dag(DAG_ID, keep_records_in_log=keep_records_in_log, session=session)
+
+        for model in (DagModel, DagRun, DagVersion, TaskInstance, TaskInstanceHistory):
+            assert _count(session, model) == 0, model.__name__
+        assert _count(session, Log) == (1 if keep_records_in_log else 0)
+
+    @pytest.mark.parametrize("batch_size", [None, 2])
+    def test_delete_dag_in_batches(self, dag_maker, session, batch_size):
+        with dag_maker(DAG_ID, session=session):
+            for i in range(3):
+                EmptyOperator(task_id=f"task_{i}")
+        dag_maker.create_dagrun()
+        session.add(Log(event="test", dag_id=DAG_ID))
+        session.flush()
+        assert _count(session, TaskInstance) == 3
+        # Only rows deleted explicitly are counted, not the ones removed by ON DELETE CASCADE.
+        expected_count = sum(
+            session.scalar(select(func.count()).select_from(stmt.table).where(stmt.table.c.dag_id == DAG_ID))
+            for stmt in _delete_statements(False)
+        )
+
+        count = delete_dag(DAG_ID, keep_records_in_log=False, batch_size=batch_size, session=session)
+
+        assert count == expected_count
+        for model in (DagModel, DagRun, TaskInstance):
+            assert _count(session, model) == 0, model.__name__
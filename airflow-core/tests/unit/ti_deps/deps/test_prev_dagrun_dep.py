@@ -18,6 +18,7 @@
 from __future__ import annotations
 
 from datetime import timedelta
+from typing import NamedTuple
 from unittest.mock import ANY, Mock, patch
 
 import pytest
@@ -30,16 +31,23 @@ from airflow.utils.state import DagRunState, TaskInstanceState
 from airflow.utils.types import DagRunTriggeredByType, DagRunType
 
 from tests_common.test_utils.dag import create_scheduler_dag, sync_dag_to_db
-from tests_common.test_utils.db import clear_db_runs
-
-pytestmark = pytest.mark.db_test
+from tests_common.test_utils.db import clear_db_runs, clear_db_serialized_dags
 
 START_DATE = convert_to_utc(datetime(2016, 1, 1))
+SUCCESSFUL_STATES = frozenset({TaskInstanceState.SUCCESS, TaskInstanceState.SKIPPED})
 
 
+@pytest.mark.db_test
 class TestPrevDagrunDep:
-    def teardown_method(self):
+    @pytest.fixture(autouse=True, scope="class")
+    def clean(self):
+        clear_db_runs()
+        clear_db_serialized_dags()
+
+        yield
+
         clear_db_runs()
+        clear_db_serialized_dags()
 
     def test_first_task_run_of_new_task(self, testing_dag_bundle):
         """
@@ -97,14 +105,37 @@ class TestPrevDagrunDep:
             mock_has_any_prior_tis.assert_called_once_with(ti, session=ANY)
 
 
+@pytest.fixture(scope="module")
+def module_dag():
+    return DAG("test_dag", schedule=timedelta(days=1), start_date=START_DATE)
+
+
+@pytest.fixture
+def dag(module_dag):
+    """Share a single DAG between test cases, removing the tasks each case adds to it."""
+    yield module_dag
+    for task_id in list(module_dag.task_dict):
+        module_dag._remove_task(task_id)
+
+
+class Case(NamedTuple):
+    depends_on_past: bool
+    wait_for_past_depends_before_skipping: bool
+    wait_for_downstream: bool
+    prev_tis: list[Mock]
+    context_ignore_depends_on_past: bool
+    expected_dep_met: bool
+    past_depends_met_xcom_sent: bool
+
+
 @pytest.mark.parametrize(
-    "kwargs",
+    "case",
     [
         # If the task does not set depends_on_past, the previous dagrun should
         # be ignored, even though previous_ti would otherwise fail the dep.
         # wait_for_past_depends_before_skipping is False, past_depends_met xcom should not be sent
         pytest.param(
-            dict(
+            Case(
                 depends_on_past=False,
                 wait_for_past_depends_before_skipping=False,
                 wait_for_downstream=False,  # wait_for_downstream=True overrides depends_on_past=False.
@@ -119,7 +150,7 @@ class TestPrevDagrunDep:
         # be ignored, even though previous_ti would otherwise fail the dep.
         # wait_for_past_depends_before_skipping is True, past_depends_met xcom should be sent
         pytest.param(
-            dict(
+            Case(
                 depends_on_past=False,
                 wait_for_past_depends_before_skipping=True,
                 wait_for_downstream=False,  # wait_for_downstream=True overrides depends_on_past=False.
@@ -134,7 +165,7 @@ class TestPrevDagrunDep:
         # though there is no previous_ti which would normally fail the dep.
         # wait_for_past_depends_before_skipping is False, past_depends_met xcom should not be sent
         pytest.param(
-            dict(
+            Case(
                 depends_on_past=True,
                 wait_for_past_depends_before_skipping=False,
                 wait_for_downstream=False,
@@ -151,7 +182,7 @@ class TestPrevDagrunDep:
         # though there is no previous_ti which would normally fail the dep.
         # wait_for_past_depends_before_skipping is True, past_depends_met xcom should be sent
         pytest.param(
-            dict(
+            Case(
                 depends_on_past=True,
                 wait_for_past_depends_before_skipping=True,
                 wait_for_downstream=False,
@@ -167,7 +198,7 @@ class TestPrevDagrunDep:
         # The first task run should pass since it has no previous dagrun.
         # wait_for_past_depends_before_skipping is False, past_depends_met xcom should not be sent
         pytest.param(
-            dict(
+            Case(
                 depends_on_past=True,
                 wait_for_past_depends_before_skipping=False,
                 wait_for_downstream=False,
@@ -181,7 +212,7 @@ class TestPrevDagrunDep:
         # The first task run should pass since it has no previous dagrun.
         # wait_for_past_depends_before_skipping is True, past_depends_met xcom should be sent
         pytest.param(
-            dict(
+            Case(
                 depends_on_past=True,
                 wait_for_past_depends_before_skipping=True,
                 wait_for_downstream=False,
@@ -194,7 +225,7 @@ class TestPrevDagrunDep:
         ),
         # Previous TI did not complete execution. This dep should fail.
         pytest.param(
-            dict(
+            Case(
                 depends_on_past=True,
                 wait_for_past_depends_before_skipping=False,
                 wait_for_downstream=False,
@@ -209,7 +240,7 @@ class TestPrevDagrunDep:
         # dagrun. It should fail this dep if the previous TI's downstream TIs
         # are not done.
         pytest.param(
-            dict(
+            Case(
                 depends_on_past=True,
                 wait_for_past_depends_before_skipping=False,
                 wait_for_downstream=True,
@@ -225,7 +256,7 @@ class TestPrevDagrunDep:
         # All the conditions for the dep are met.
         # wait_for_past_depends_before_skipping is False, past_depends_met xcom should not be sent
         pytest.param(
-            dict(
+            Case(
                 depends_on_past=True,
                 wait_for_past_depends_before_skipping=False,
                 wait_for_downstream=True,
@@ -241,7 +272,7 @@ class TestPrevDagrunDep:
         # All the conditions for the dep are met
         # wait_for_past_depends_before_skipping is True, past_depends_met xcom should be sent
         pytest.param(
-            dict(
+            Case(
                 depends_on_past=True,
                 wait_for_past_depends_before_skipping=True,
                 wait_for_downstream=True,
@@ -258,22 +289,15 @@ class TestPrevDagrunDep:
 )
 @patch("airflow.models.dagrun.DagRun.get_previous_scheduled_dagrun")
 @patch("airflow.models.dagrun.DagRun.get_previous_dagrun")
-def test_dagrun_dep(mock_get_previous_dagrun, mock_get_previous_scheduled_dagrun, kwargs):
-    depends_on_past = kwargs["depends_on_past"]
-    wait_for_past_depends_before_skipping = kwargs["wait_for_past_depends_before_skipping"]
-    wait_for_downstream = kwargs["wait_for_downstream"]
-    prev_tis = kwargs["prev_tis"]
-    context_ignore_depends_on_past = kwargs["context_ignore_depends_on_past"]
-    expected_dep_met = kwargs["expected_dep_met"]
-    past_depends_met_xcom_sent = kwargs["past_depends_met_xcom_sent"]
+def test_dagrun_dep(mock_get_previous_dagrun, mock_get_previous_scheduled_dagrun, dag, case):
     task = BaseOperator(
         task_id="test_task",
-        dag=DAG("test_dag", schedule=timedelta(days=1), start_date=datetime(2016, 1, 1)),
-        depends_on_past=depends_on_past,
+        dag=dag,
+        depends_on_past=case.depends_on_past,
         start_date=datetime(2016, 1, 1),
-        wait_for_downstream=wait_for_downstream,
+        wait_for_downstream=case.wait_for_downstream,
     )
-    if prev_tis:
+    if case.prev_tis:
         prev_dagrun = Mock(logical_date=datetime(2016, 1, 2))
     else:
         prev_dagrun = None
@@ -293,18 +317,22 @@ def test_dagrun_dep(mock_get_previous_dagrun, mock_get_previous_scheduled_dagrun
         **{"get_dagrun.return_value": dagrun, "xcom_push.return_value": None},
     )
     dep_context = DepContext(
-        ignore_depends_on_past=context_ignore_depends_on_past,
-        wait_for_past_depends_before_skipping=wait_for_past_depends_before_skipping,
+        ignore_depends_on_past=case.context_ignore_depends_on_past,
+        wait_for_past_depends_before_skipping=case.wait_for_past_depends_before_skipping,
     )
 
-    unsuccessful_tis_count = sum(
-        int(ti.state not in {TaskInstanceState.SUCCESS, TaskInstanceState.SKIPPED}) for ti in prev_tis
-    )
+    unsuccessful_tis_count = 0
+    has_unsuccessful_dependants = False
+    for prev_ti in case.prev_tis:
+        if prev_ti.state not in SUCCESSFUL_STATES:
+            unsuccessful_tis_count += 1
+        if not prev_ti.are_dependents_done():
+            has_unsuccessful_dependants = True
 
-    mock_has_tis = Mock(return_value=bool(prev_tis))
-    mock_has_any_prior_tis = Mock(return_value=bool(prev_tis))
+    mock_has_tis = Mock(return_value=bool(case.prev_tis))
+    mock_has_any_prior_tis = Mock(return_value=bool(case.prev_tis))
     mock_count_unsuccessful_tis = Mock(return_value=unsuccessful_tis_count)
-    mock_has_unsuccessful_dependants = Mock(return_value=any(not ti.are_dependents_done() for ti in prev_tis))
+    mock_has_unsuccessful_dependants = Mock(return_value=has_unsuccessful_dependants)
 
     dep = PrevDagrunDep()
     with patch.multiple(
@@ -317,19 +345,22 @@ def test_dagrun_dep(mock_get_previous_dagrun, mock_get_previous_scheduled_dagrun
         actual_dep_met = dep.is_met(ti=ti, dep_context=dep_context)
 
         mock_has_any_prior_tis.assert_not_called()
-        if depends_on_past and not context_ignore_depends_on_past and prev_tis:
+        should_check_prev_tis = (
+            case.depends_on_past and not case.context_ignore_depends_on_past and case.prev_tis
+        )
+        if should_check_prev_tis:
             mock_has_tis.assert_called_once_with(prev_dagrun, "test_task", session=ANY)
             mock_count_unsuccessful_tis.assert_called_once_with(prev_dagrun, "test_task", session=ANY)
         else:
             mock_has_tis.assert_not_called()
             mock_count_unsuccessful_tis.assert_not_called()
-        if depends_on_past and not context_ignore_depends_on_past and prev_tis and not unsuccessful_tis_count:
+        if should_check_prev_tis and not unsuccessful_tis_count:
             mock_has_unsuccessful_dependants.assert_called_once_with(prev_dagrun, task, session=ANY)
         else:
             mock_has_unsuccessful_dependants.assert_not_called()
 
-    assert actual_dep_met == expected_dep_met
-    if past_depends_met_xcom_sent:
+    assert actual_dep_met == case.expected_dep_met
+    if case.past_depends_met_xcom_sent:
         ti.xcom_push.assert_called_with(key="past_depends_met", value=True)
     else:
         ti.xcom_push.assert_not_called()
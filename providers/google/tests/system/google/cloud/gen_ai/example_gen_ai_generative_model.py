@@ -23,9 +23,13 @@ Example Airflow DAG for Google Gen AI Generative Model prompting.
 from __future__ import annotations
 
 import os
+import re
 from datetime import datetime
+from operator import itemgetter
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
     from airflow.sdk import task
@@ -56,6 +60,11 @@ from airflow.providers.google.cloud.operators.vertex_ai.experiment_service impor
 from airflow.providers.google.cloud.operators.vertex_ai.generative_model import RunEvaluationOperator
 from airflow.providers.google.common.utils.get_secret import get_secret
 
+# Versioned model names look like "gemini-2.5-pro", "gemini-1.5-pro-002" and "text-embedding-004".
+# A generative model without a numeric revision counts as revision 0.
+_GENERATIVE_MODEL_RE = re.compile(r"^[^-]+-(?P<version>\d+(?:\.\d+)?)(?:-.*?)?(?:-(?P<revision>\d+))?$")
+_EMBEDDING_MODEL_RE = re.compile(r"-(?P<revision>\d+)$")
+
 
 def _get_actual_models(key) -> dict[str, str]:
     models: dict[str, str] = {
@@ -64,65 +73,50 @@ def _get_actual_models(key) -> dict[str, str]:
         "cached-model": "",
     }
     try:
-        response = requests.get(
-            "https://generativelanguage.googleapis.com/v1/models",
-            {"key": key},
-            timeout=10,
-        )
-        response.raise_for_status()
-        available_models = response.json()
+        with requests.Session() as session:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+            )
+            session.mount("https://", HTTPAdapter(max_retries=retry))
+            response = session.get(
+                "https://generativelanguage.googleapis.com/v1/models",
+                params={"key": key},
+                timeout=10,
+            )
+            response.raise_for_status()
+            available_models = response.json()
     except requests.exceptions.RequestException as e:
         print(f"Error fetching models from API: {e}")
         return models
 
+    # Candidates for every kind of model, as (version, model name) pairs.
+    candidates: dict[str, list[tuple[tuple[float, ...], str]]] = {kind: [] for kind in models}
     for model in available_models.get("models", []):
-        try:
-            model_name = model["name"].split("/")[-1]
-            splited_model_name = model_name.split("-")
-            if not models["text-embedding"] and ("text" in model_name and "embedding" in model_name):
-                models["text-embedding"] = model_name
-            elif (
-                models["text-embedding"]
-                and ("text" in model_name and "embedding" in model_name)
-                and int(splited_model_name[-1]) > int(models["text-embedding"].split("-")[-1])
-            ):
-                models["text-embedding"] = model_name
-            elif ("vision" not in model_name or "image" in model_name) and (
-                "flash" in model_name or "pro" in model_name
-            ):
-                if not models["multimodal"] and "pro" in model_name:
-                    models["multimodal"] = model_name
-                elif (
-                    models["multimodal"]
-                    and "pro" in model_name
-                    and float(models["multimodal"].split("-")[1]) < float(splited_model_name[1])
-                ):
-                    models["multimodal"] = model_name
-                elif (
-                    models["multimodal"]
-                    and "pro" in model_name
-                    and (
-                        float(models["multimodal"].split("-")[1]) == float(splited_model_name[1])
-                        and int(splited_model_name[-1]) > int(models["multimodal"].split("-")[-1])
-                    )
-                ):
-                    models["multimodal"] = model_name
-                if "createCachedContent" in model["supportedGenerationMethods"]:
-                    if not models["cached-model"]:
-                        models["cached-model"] = model_name
-                    elif models["cached-model"] and float(models["cached-model"].split("-")[1]) < float(
-                        splited_model_name[1]
-                    ):
-                        models["cached-model"] = model_name
-                    elif (
-                        models["cached-model"]
-                        and float(models["cached-model"].split("-")[1]) == float(splited_model_name[1])
-                        and int(splited_model_name[-1]) > int(models["cached-model"].split("-")[-1])
-                    ):
-                        models["cached-model"] = model_name
-        except (ValueError, IndexError) as e:
-            print(f"Could not parse model name '{model.get('name')}'. Skipping. Error: {e}")
+        model_name = model["name"].split("/")[-1]
+        if "text" in model_name and "embedding" in model_name:
+            kinds = ["text-embedding"]
+            match = _EMBEDDING_MODEL_RE.search(model_name)
+        elif ("vision" not in model_name or "image" in model_name) and (
+            "flash" in model_name or "pro" in model_name
+        ):
+            kinds = ["multimodal"] if "pro" in model_name else []
+            if "createCachedContent" in model["supportedGenerationMethods"]:
+                kinds.append("cached-model")
+            match = _GENERATIVE_MODEL_RE.match(model_name)
+        else:
+            continue
+        if match is None:
+            print(f"Could not parse model name '{model.get('name')}'. Skipping.")
             continue
+        version = tuple(float(part or 0) for part in match.groups())
+        for kind in kinds:
+            candidates[kind].append((version, model_name))
+    for kind, kind_candidates in candidates.items():
+        if kind_candidates:
+            models[kind] = max(kind_candidates, key=itemgetter(0))[1]
     if not any(models.values()):
         raise ValueError(f"Some of the models not found {models}")
     return models
@@ -130,7 +124,6 @@ def _get_actual_models(key) -> dict[str, str]:
 
 ENV_ID = os.environ.get("SYSTEM_TESTS_ENV_ID", "default")
 GEMINI_API_KEY = "api_key"
-MODELS = "{{ task_instance.xcom_pull('get_actual_models') }}"
 PROJECT_ID = os.environ.get("SYSTEM_TESTS_GCP_PROJECT", "default")
 DAG_ID = "gen_ai_generative_model_dag"
 REGION = "us-central1"
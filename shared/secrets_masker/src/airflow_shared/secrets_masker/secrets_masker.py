@@ -25,7 +25,8 @@ import inspect
 import logging
 import re
 import sys
-from collections.abc import Generator, Iterable, Iterator
+import weakref
+from collections.abc import Collection, Generator, Iterable, Iterator
 from enum import Enum
 from functools import cache, cached_property
 from re import Pattern
@@ -71,6 +72,9 @@ DEFAULT_SENSITIVE_FIELDS = frozenset(
 SECRETS_TO_SKIP_MASKING = {"airflow"}
 """Common terms that should be excluded from masking in both production and tests"""
 
+_MISSING = object()
+"""Sentinel for keys missing from the original value in :meth:`SecretsMasker.merge`."""
+
 
 def should_hide_value_for_key(name):
     """
@@ -178,10 +182,87 @@ def _get_v1_env_var_type_cached() -> type:
         return type("V1EnvVar", (), {})
 
 
+_PATTERN_TOKEN_RE = re.compile(r"\\.|.", re.DOTALL)
+"""Split an escaped pattern into tokens, keeping escape sequences such as ``\\.`` together."""
+
+
+def _trie_to_regex(node: dict[str, dict]) -> str:
+    branches = []
+    for token, child in sorted(node.items()):
+        if not token:
+            continue
+        # Collapse runs of single-child nodes so a long secret doesn't add a nesting level per char.
+        parts = [token]
+        sub = child
+        while len(sub) == 1 and "" not in sub:
+            ((tok, sub),) = sub.items()
+            parts.append(tok)
+        parts.append(_trie_to_regex(sub))
+        branches.append("".join(parts))
+
+    if not branches:
+        return ""
+    is_end = "" in node
+    if len(branches) == 1 and not is_end:
+        return branches[0]
+    regex = "(?:" + "|".join(branches) + ")"
+    return regex + "?" if is_end else regex
+
+
+def _compile_replacer(patterns: Collection[str]) -> Pattern:
+    """
+    Compile the (already escaped) ``patterns`` into a single regex that matches any of them.
+
+    A flat ``a|b|c`` alternation makes the regex engine try every pattern in turn at each position of the
+    string. The patterns are folded into a trie instead, so shared prefixes are only matched once and each
+    position costs one step per trie level regardless of how many secrets are registered. The branches are
+    greedy, so when one secret is a prefix of another the longest one is masked.
+    """
+    trie: dict[str, dict] = {}
+    for pattern in patterns:
+        node = trie
+        for token in _PATTERN_TOKEN_RE.findall(pattern):
+            node = node.setdefault(token, {})
+        node[""] = {}
+    try:
+        return re.compile(_trie_to_regex(trie))
+    except (RecursionError, re.error):
+        # Pathologically deep tries, or patterns that are not plain escaped strings (splitting those at a
+        # shared prefix can break a group or a character set); fall back to trying the longest patterns first.
+        return re.compile("|".join(sorted(patterns, key=len, reverse=True)))
+
+
+_REPLACER_CACHE: weakref.WeakValueDictionary[frozenset[str], Pattern] = weakref.WeakValueDictionary()
+"""Replacers currently in use by any masker, so maskers with the same secrets share one compiled regex."""
+
+
+def _build_replacer(patterns: Collection[str]) -> Pattern:
+    key = frozenset(patterns)
+    replacer = _REPLACER_CACHE.get(key)
+    if replacer is None:
+        replacer = _REPLACER_CACHE[key] = _compile_replacer(key)
+    return replacer
+
+
+_REDACT_CACHE_MAX_LEN = 256
+"""Strings longer than this are not worth keeping around in a masker's redaction cache."""
+
+_REDACT_CACHE_MAX_SIZE = 4096
+"""Number of redacted strings a masker keeps before starting its cache afresh."""
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_sensitive_name(name: str, sensitive_fields: frozenset[str]) -> bool:
+    # The same handful of dict keys and variable names is checked over and over again while redacting.
+    name = name.strip().lower()
+    return name in sensitive_fields or any(s in name for s in sensitive_fields)
+
+
 class SecretsMasker(logging.Filter):
     """Redact secrets from logs."""
 
-    replacer: Pattern | None = None
+    _replacer_state: tuple[Pattern | None, dict[tuple[str, str], str]] = (None, {})
+    """The replacer together with the cache of strings it redacted; always swapped as a whole."""
     patterns: set[str]
 
     ALREADY_FILTERED_FLAG = "__SecretsMasker_filtered"
@@ -195,9 +276,32 @@ class SecretsMasker(logging.Filter):
     def __init__(self):
         super().__init__()
         self.patterns = set()
-        self.sensitive_variables_fields = []
+        self.replacer = None
+        self.sensitive_variables_fields = frozenset()
         self.hide_sensitive_var_conn_fields = True
 
+    @property
+    def replacer(self) -> Pattern | None:
+        """Regex matching any of the masked secrets, or ``None`` when nothing is masked."""
+        return self._replacer_state[0]
+
+    @replacer.setter
+    def replacer(self, replacer: Pattern | None) -> None:
+        # Cached results are only valid for the replacer that produced them. A single assignment keeps a
+        # concurrent redact from storing a result of the old replacer in the new cache.
+        self._replacer_state = (replacer, {})
+
+    @property
+    def sensitive_variables_fields(self) -> frozenset[str]:
+        """Names (or parts of names) of fields whose values should be hidden."""
+        return self._sensitive_variables_fields
+
+    @sensitive_variables_fields.setter
+    def sensitive_variables_fields(self, fields: Iterable[str]) -> None:
+        # Stored as a frozenset: it is part of the should_hide_value_for_key cache key (and frozensets
+        # cache their hash), and exact matches can then be found without the substring scan.
+        self._sensitive_variables_fields = frozenset(fields)
+
     @classmethod
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -304,6 +408,10 @@ class SecretsMasker(logging.Filter):
                 dict_key: self._redact_all(subval, depth + 1, max_depth, replacement=replacement)
                 for dict_key, subval in item.items()
             }
+        if isinstance(item, (tuple, set, list)) and all(type(subval) is str for subval in item):
+            # Flat collection of strings, every one of them is replaced so don't walk it item by item.
+            masked = [replacement] * len(item)
+            return masked if isinstance(item, list) else tuple(masked)
         if isinstance(item, (tuple, set)):
             # Turn set in to tuple!
             return tuple(
@@ -326,6 +434,10 @@ class SecretsMasker(logging.Filter):
         try:
             if name and self.should_hide_value_for_key(name):
                 return self._redact_all(item, depth, max_depth, replacement=replacement)
+            if type(item) is str:
+                # By far the most common case, so check for it before walking the isinstance chain
+                # below (str subclasses, such as str Enums, still go through that).
+                return self._redact_str(item, replacement)
             if isinstance(item, dict):
                 to_return = {
                     dict_key: self._redact(
@@ -348,12 +460,7 @@ class SecretsMasker(logging.Filter):
                     )
                 return tmp
             if isinstance(item, str):
-                if self.replacer:
-                    # We can't replace specific values, but the key-based redacting
-                    # can still happen, so we can't short-circuit, we need to walk
-                    # the structure.
-                    return self.replacer.sub(replacement, str(item))
-                return item
+                return self._redact_str(item, replacement)
             if isinstance(item, (tuple, set)):
                 # Turn set in to tuple!
                 return tuple(
@@ -385,6 +492,26 @@ class SecretsMasker(logging.Filter):
             # Rather than expose sensitive info, lets play it safe
             return "<redaction-failed>"
 
+    def _redact_str(self, item: str, replacement: str) -> str:
+        # Read once: add_mask may swap in a new replacer (and cache) from another thread meanwhile.
+        replacer, cache = self._replacer_state
+        if replacer:
+            # We can't replace specific values, but the key-based redacting
+            # can still happen, so we can't short-circuit, we need to walk
+            # the structure.
+            if len(item) > _REDACT_CACHE_MAX_LEN:
+                return replacer.sub(replacement, str(item))
+            # The same short strings (log arguments, connection URIs, ...) come through
+            # here over and over again.
+            key = (replacement, str(item))
+            redacted = cache.get(key)
+            if redacted is None:
+                if len(cache) >= _REDACT_CACHE_MAX_SIZE:
+                    cache.clear()
+                redacted = cache[key] = replacer.sub(replacement, key[1])
+            return redacted
+        return item
+
     def _merge(
         self,
         new_item: Redacted,
@@ -397,8 +524,11 @@ class SecretsMasker(logging.Filter):
         replacement: str,
     ) -> Redacted:
         """Merge a redacted item with its original unredacted counterpart."""
+        if new_item is old_item:
+            # Unchanged (sub)tree, there is nothing to restore in it.
+            return new_item
         if depth > max_depth:
-            if isinstance(new_item, str) and new_item == "***":
+            if isinstance(new_item, str) and new_item == replacement:
                 return old_item
             return new_item
 
@@ -406,49 +536,51 @@ class SecretsMasker(logging.Filter):
             # Determine if we should treat this as sensitive
             is_sensitive = force_sensitive or (name is not None and self.should_hide_value_for_key(name))
 
+            if type(new_item) is str:
+                # Most leaves are plain strings, so settle them before the container checks below.
+                return old_item if is_sensitive and new_item == replacement else new_item
+
             if isinstance(new_item, dict) and isinstance(old_item, dict):
                 merged = {}
-                for key in new_item.keys():
-                    if key in old_item:
+                for key, new_subitem in new_item.items():
+                    old_subitem = old_item.get(key, _MISSING)
+                    if old_subitem is _MISSING:
+                        merged[key] = new_subitem
+                    else:
                         # For dicts, pass the key as name unless we're in sensitive mode
                         child_name = None if is_sensitive else key
                         merged[key] = self._merge(
-                            new_item[key],
-                            old_item[key],
+                            new_subitem,
+                            old_subitem,
                             name=child_name,
                             depth=depth + 1,
                             max_depth=max_depth,
                             force_sensitive=is_sensitive,
                             replacement=replacement,
                         )
-                    else:
-                        merged[key] = new_item[key]
                 return merged
 
             if isinstance(new_item, (list, tuple)) and type(old_item) is type(new_item):
-                merged_list = []
-                for i in range(len(new_item)):
-                    if i < len(old_item):
-                        # In sensitive mode, check if individual item is redacted
-                        if is_sensitive and isinstance(new_item[i], str) and new_item[i] == "***":
-                            merged_list.append(old_item[i])
-                        else:
-                            merged_list.append(
-                                self._merge(
-                                    new_item[i],
-                                    old_item[i],
-                                    name=None,
-                                    depth=depth + 1,
-                                    max_depth=max_depth,
-                                    force_sensitive=is_sensitive,
-                                    replacement=replacement,
-                                )
-                            )
-                    else:
-                        merged_list.append(new_item[i])
+                merged_list = [
+                    # In sensitive mode, check if individual item is redacted
+                    old_subitem
+                    if is_sensitive and isinstance(new_subitem, str) and new_subitem == replacement
+                    else self._merge(
+                        new_subitem,
+                        old_subitem,
+                        name=None,
+                        depth=depth + 1,
+                        max_depth=max_depth,
+                        force_sensitive=is_sensitive,
+                        replacement=replacement,
+                    )
+                    for new_subitem, old_subitem in zip(new_item, old_item)
+                ]
+                # Items added past the end of the original have nothing to restore
+                merged_list.extend(new_item[len(old_item) :])
 
                 if isinstance(new_item, list):
-                    return list(merged_list)
+                    return merged_list
                 return tuple(merged_list)
 
             if isinstance(new_item, set) and isinstance(old_item, set):
@@ -459,7 +591,7 @@ class SecretsMasker(logging.Filter):
                 # TODO: Handle Kubernetes V1EnvVar objects if needed
                 return new_item
 
-            if is_sensitive and isinstance(new_item, str) and new_item == "***":
+            if is_sensitive and isinstance(new_item, str) and new_item == replacement:
                 return old_item
             return new_item
 
@@ -529,21 +661,34 @@ class SecretsMasker(logging.Filter):
         Name might be a Variable name, or key in conn.extra_dejson, for example.
         """
         if isinstance(name, str) and self.hide_sensitive_var_conn_fields:
-            name = name.strip().lower()
-            return any(s in name for s in self.sensitive_variables_fields)
+            return _is_sensitive_name(name, self._sensitive_variables_fields)
         return False
 
     def add_mask(self, secret: JsonValue, name: str | None = None):
         """Add a new secret to be masked to this filter instance."""
+        if self._add_patterns(secret, name):
+            self.replacer = _build_replacer(self.patterns)
+
+    def _add_patterns(self, secret: JsonValue, name: str | None) -> bool:
+        """
+        Add the patterns for ``secret`` without rebuilding the replacer.
+
+        Dicts and iterables are walked recursively, so the replacer is only rebuilt once per
+        :meth:`add_mask` call however many secrets they contain.
+
+        :return: whether any new pattern was added.
+        """
         if isinstance(secret, dict):
+            new_mask = False
             for k, v in secret.items():
-                self.add_mask(v, k)
-        elif isinstance(secret, str):
+                new_mask |= self._add_patterns(v, k)
+            return new_mask
+        if isinstance(secret, str):
             if not secret:
-                return
+                return False
 
             if secret.lower() in SECRETS_TO_SKIP_MASKING:
-                return
+                return False
 
             min_length = self.min_length_to_mask
             if len(secret) < min_length:
@@ -554,7 +699,11 @@ class SecretsMasker(logging.Filter):
                         extra={self.ALREADY_FILTERED_FLAG: True},
                     )
                     SecretsMasker._has_warned_short_secret = True
-                return
+                return False
+
+            if name and not self.should_hide_value_for_key(name):
+                # Nothing to add, so don't bother computing (possibly expensive) adaptations either.
+                return False
 
             new_mask = False
             for s in self._adaptations(secret):
@@ -566,15 +715,16 @@ class SecretsMasker(logging.Filter):
                         continue
 
                     pattern = re.escape(s)
-                    if pattern not in self.patterns and (not name or self.should_hide_value_for_key(name)):
+                    if pattern not in self.patterns:
                         self.patterns.add(pattern)
                         new_mask = True
-            if new_mask:
-                self.replacer = re.compile("|".join(self.patterns))
-
-        elif isinstance(secret, collections.abc.Iterable):
+            return new_mask
+        if isinstance(secret, collections.abc.Iterable):
+            new_mask = False
             for v in secret:
-                self.add_mask(v, name)
+                new_mask |= self._add_patterns(v, name)
+            return new_mask
+        return False
 
     def reset_masker(self):
         """Reset the patterns and the replacer in the masker instance."""
@@ -647,7 +797,9 @@ class RedactedIO(TextIO):
         return self.target.writable()
 
     def write(self, s: str) -> int:
-        s = str(redact(s))
+        # print() writes ``sep`` and ``end`` with separate calls, don't run the masker over those.
+        if not (isinstance(s, str) and s.isspace()):
+            s = str(redact(s))
         return self.target.write(s)
 
     def writelines(self, lines) -> None:
@@ -25,7 +25,7 @@ import sys
 import textwrap
 from enum import Enum
 from io import StringIO
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -33,6 +33,7 @@ from airflow_shared.secrets_masker.secrets_masker import (
     DEFAULT_SENSITIVE_FIELDS,
     RedactedIO,
     SecretsMasker,
+    _build_replacer,
     mask_secret,
     merge,
     redact,
@@ -484,6 +485,16 @@ class TestShouldHideValueForKey:
         assert masker.should_hide_value_for_key("password") is hide_sensitive_var_conn_fields
         assert masker.should_hide_value_for_key("GOOGLE_API_KEY") is hide_sensitive_var_conn_fields
 
+    def test_changing_sensitive_fields(self):
+        masker = SecretsMasker()
+        configure_secrets_masker_for_test(masker, sensitive_fields=["password"])
+        assert masker.should_hide_value_for_key("my_password") is True
+        assert masker.should_hide_value_for_key("my_token") is False
+
+        configure_secrets_masker_for_test(masker, sensitive_fields=["token"])
+        assert masker.should_hide_value_for_key("my_password") is False
+        assert masker.should_hide_value_for_key("my_token") is True
+
 
 class ShortExcFormatter(logging.Formatter):
     """Don't include full path in exc_info messages"""
@@ -523,6 +534,12 @@ class TestRedactedIO:
         stdout = capsys.readouterr().out
         assert stdout == "***"
 
+    def test_write_whitespace_skips_redaction(self, capsys):
+        with patch("airflow_shared.secrets_masker.secrets_masker.redact") as mock_redact:
+            RedactedIO().write("\n")
+        mock_redact.assert_not_called()
+        assert capsys.readouterr().out == "\n"
+
     def test_input_builtin(self, monkeypatch):
         """
         Test that when redirect is inplace the `input()` builtin works.
@@ -579,6 +596,23 @@ class TestMaskSecretAdapter:
 
         assert self.secrets_masker.patterns == {"a secret"}
 
+    def test_unescaped_patterns_sharing_a_prefix_are_still_masked(self):
+        # Splitting these at their common prefix would cut the character sets in half.
+        mask_secret("secret[ab]1")
+        mask_secret("secret[ac]2")
+
+        assert self.secrets_masker.replacer is not None
+        assert self.secrets_masker.redact("secretb1 secretc2") == "*** ***"
+
+    def test_adapter_not_called_for_non_sensitive_name(self):
+        adapter = MagicMock(return_value="adapted secret")
+        self.secrets_masker.secret_mask_adapter = adapter
+
+        mask_secret("a secret", "not_hidden")
+
+        adapter.assert_not_called()
+        assert self.secrets_masker.patterns == set()
+
     @pytest.mark.parametrize(
         ("secret", "should_be_masked", "is_first_short", "comment"),
         [
@@ -771,6 +805,105 @@ class TestEdgeCases:
         assert redacted.startswith("Contains ")
         assert " and " in redacted
 
+    def test_repeated_redaction_picks_up_new_masks(self):
+        secrets_masker = SecretsMasker()
+        configure_secrets_masker_for_test(secrets_masker)
+        secrets_masker.add_mask("first_secret")
+
+        message = "first_secret and second_secret"
+        assert secrets_masker.redact(message) == "*** and second_secret"
+
+        secrets_masker.add_mask("second_secret")
+        assert secrets_masker.redact(message) == "*** and ***"
+
+        secrets_masker.reset_masker()
+        assert secrets_masker.redact(message) == message
+
+    def test_reset_masker_drops_cached_redactions(self):
+        secrets_masker = SecretsMasker()
+        configure_secrets_masker_for_test(secrets_masker)
+        secrets_masker.add_mask("first_secret")
+        secrets_masker.redact("first_secret and second_secret")
+        assert secrets_masker._replacer_state[1]
+
+        secrets_masker.reset_masker()
+        assert not secrets_masker._replacer_state[1]
+
+    def test_redaction_racing_add_mask_is_not_cached_for_new_replacer(self):
+        secrets_masker = SecretsMasker()
+        configure_secrets_masker_for_test(secrets_masker)
+        secrets_masker.add_mask("first_secret")
+        old_replacer = secrets_masker.replacer
+
+        class AddMaskWhileRedacting:
+            """Stands in for the old replacer while another thread adds a mask mid-redaction."""
+
+            def sub(self, replacement, value):
+                secrets_masker.add_mask("second_secret")
+                return old_replacer.sub(replacement, value)
+
+        secrets_masker.replacer = AddMaskWhileRedacting()
+        message = "first_secret and second_secret"
+        assert secrets_masker.redact(message) == "*** and second_secret"
+
+        assert secrets_masker.redact(message) == "*** and ***"
+
+    def test_add_mask_nested_builds_replacer_once(self):
+        secrets_masker = SecretsMasker()
+        configure_secrets_masker_for_test(secrets_masker)
+
+        with patch(
+            "airflow_shared.secrets_masker.secrets_masker._build_replacer",
+            wraps=_build_replacer,
+        ) as mock_build:
+            secrets_masker.add_mask(
+                {"password": "first_secret", "nested": {"token": "second_secret"}, "secret": ["third_secret"]}
+            )
+
+        mock_build.assert_called_once()
+        assert secrets_masker.redact("first_secret second_secret third_secret") == "*** *** ***"
+
+    @pytest.mark.parametrize(
+        "secrets",
+        [
+            ["secret_value", "secret_value_extended"],
+            ["secret_value_extended", "secret_value"],
+        ],
+    )
+    def test_longest_overlapping_secret_is_masked(self, secrets):
+        secrets_masker = SecretsMasker()
+        configure_secrets_masker_for_test(secrets_masker)
+        for secret in secrets:
+            secrets_masker.add_mask(secret)
+
+        assert secrets_masker.redact("secret_value_extended, secret_value") == "***, ***"
+
+    def test_maskers_with_same_secrets_share_replacer(self):
+        first, second = SecretsMasker(), SecretsMasker()
+        for secrets_masker in (first, second):
+            configure_secrets_masker_for_test(secrets_masker)
+            secrets_masker.add_mask("first_secret")
+            secrets_masker.add_mask("second_secret")
+
+        assert first.replacer is second.replacer
+
+        second.add_mask("third_secret")
+        assert first.replacer is not second.replacer
+        assert first.redact("third_secret") == "third_secret"
+        assert second.redact("third_secret") == "***"
+
+    def test_secrets_sharing_a_prefix(self):
+        secrets_masker = SecretsMasker()
+        configure_secrets_masker_for_test(secrets_masker)
+
+        for secret in ["password1", "password2", "passphrase", "pass.word"]:
+            secrets_masker.add_mask(secret)
+
+        assert (
+            secrets_masker.redact("password1 password2 passphrase pass.word passwordX passXword")
+            == "*** *** *** *** passwordX passXword"
+        )
+
 
 class TestDirectMethodCalls:
     def test_redact_all_directly(self):
@@ -797,6 +930,22 @@ class TestDirectMethodCalls:
         assert isinstance(result["nested"]["set"], tuple)
         assert all(val == "***" for val in result["nested"]["set"])
 
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            (["a", "b"], ["***", "***"]),
+            (("a", "b"), ("***", "***")),
+            ({"a"}, ("***",)),
+            ([], []),
+            (["a", 1, ["b"]], ["***", 1, ["***"]]),
+            (("a", None), ("***", None)),
+        ],
+    )
+    def test_redact_all_collections(self, value, expected):
+        secrets_masker = SecretsMasker()
+
+        assert secrets_masker._redact_all(value, depth=0, replacement="***") == expected
+
 
 class TestMixedDataScenarios:
     def test_mixed_structured_unstructured_data(self):
@@ -1080,6 +1229,22 @@ class TestSecretsMaskerMerge:
         result = self.masker.merge(new_data, old_data, max_depth=10)
         assert result["level1"]["level2"]["level3"]["password"] == "original_password"
 
+    def test_merge_same_object(self):
+        config = {"host": "localhost"}
+        old_data = {"password": "original_password", "config": config}
+        new_data = {"password": "***", "config": config}
+
+        result = self.masker.merge(new_data, old_data)
+        assert result == {"password": "original_password", "config": {"host": "localhost"}}
+        assert result["config"] is config
+
+    def test_merge_custom_replacement(self):
+        old_data = {"password": "original_password", "token": "original_token"}
+        new_data = {"password": "<redacted>", "token": "***"}
+
+        result = self.masker.merge(new_data, old_data, replacement="<redacted>")
+        assert result == {"password": "original_password", "token": "***"}
+
     def test_merge_enum_values(self):
         old_enum = MyEnum.testname
         new_enum = MyEnum.testname2